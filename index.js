@@ -23,6 +23,19 @@ const ALLOWED_AUDIO_MIMETYPES = new Set([
   "audio/x-m4a",
 ]);
 
+const emailMessageOutput = Output.object({
+  schema: z.object({
+    emailMessage: z.object({
+      emailSubject: z.string(),
+      emailBody: z.string()
+    })
+  })
+});
+
+const MAX_EMAIL_SUBJECT_LENGTH = 120;
+
+const SIGN_OFF_LINE = /^(?:thanks|thank you|many thanks|best|best regards|kind regards|regards|cheers|sincerely)[ \t]*[,.!]?$/i;
+
 const audioUpload = multer({
   storage: multer.diskStorage({
     destination: (_req, _file, cb) => cb(null, "/tmp"),
@@ -99,6 +112,28 @@ async function auth(req, res, next) {
   }
 }
 
+function parseEmailMessage(text) {
+
+  // The transcription prompt asks for "Subject: <subject>", a blank line, then the body
+  const match = text?.match(/^\s*Subject:[ \t]*(\S.*)\r?\n[ \t]*\r?\n([\s\S]*)$/i);
+
+  if (!match) return null;
+
+  const emailSubject = match[1].trim();
+  const emailBody = match[2].trim();
+
+  // Anything off-format is left to the gpt-4o extraction
+  if (!emailSubject || !emailBody || /^[ \t]*Subject:/im.test(emailBody)) return null;
+
+  // A long or multi-sentence subject usually means the body was run onto the subject line
+  if (emailSubject.length > MAX_EMAIL_SUBJECT_LENGTH || /[.!?][ \t]+\S/.test(emailSubject)) return null;
+
+  // A body that starts with the sign-off has lost its content to the subject
+  if (SIGN_OFF_LINE.test(emailBody.split(/\r?\n/, 1)[0].trim())) return null;
+
+  return { emailSubject, emailBody };
+}
+
 
 app.post("/transcribe", auth, audioUpload.single("file"), async (req, res) => {
 
@@ -142,41 +177,42 @@ app.post("/transcribe", auth, audioUpload.single("file"), async (req, res) => {
 
     }); 
 
-    const { output } = await generateText({
-    
-        model: openai("gpt-4o"),
-        system: 'Extract subject and body from email message.',
-        prompt: transcription.text,
-        output: Output.object({
-          schema: z.object({
-            emailMessage: z.object({
-              emailSubject: z.string(),
-              emailBody: z.string()
-            })
-          })
-        })
-            
-    });
+    let emailMessage = parseEmailMessage(transcription.text);
+
+    if (!emailMessage) {
+
+      // Transcription didn't follow the "Subject: ..." format, let the model split it
+      const { output } = await generateText({
+
+          model: openai("gpt-4o"),
+          system: 'Extract subject and body from email message.',
+          prompt: transcription.text,
+          output: emailMessageOutput
+
+      });
+
+      emailMessage = output.emailMessage;
+
+    }
 
- 
     await inngest.send({
       name: "app/voice.submitted",
       data: {
 
         uid: req.user.uid,
-        subject: output.emailMessage.emailSubject,
-        body: output.emailMessage.emailBody,
+        subject: emailMessage.emailSubject,
+        body: emailMessage.emailBody,
         transcription: transcription.text,
         file: req.file
 
       },
     });
 
-    return res.json({ 
+    return res.json({
+
+      subject: emailMessage.emailSubject,
+      body: emailMessage.emailBody,
 
-      subject: output.emailMessage.emailSubject,
-      body: output.emailMessage.emailBody,
-      
     });
 
   } catch (err) {
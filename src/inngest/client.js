@@ -1,7 +1,6 @@
 import 'dotenv/config'
 import { Inngest } from "inngest";
 import { createVoiceEmail } from "../services/emailService.js";
-import { uploadAudioFile } from '../services/fileService.js';
 
 export const inngest = new Inngest({ 
     
@@ -21,6 +20,8 @@ const processVoiceEmail = inngest.createFunction(
     const { data } = event;
 
     const fileUrl = await step.run("upload-audio", async () => {
+      // Loaded lazily so the S3 SDK stays off the /transcribe cold start
+      const { uploadAudioFile } = await import('../services/fileService.js');
       return await uploadAudioFile(data.file);
     });
 